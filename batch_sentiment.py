@@ -0,0 +1,360 @@
+import argparse
+import itertools
+import sqlite3
+import string
+import time
+
+import numpy as np
+import pandas as pd
+from vaderSentiment.vaderSentiment import (
+    BOOSTER_DICT,
+    C_INCR,
+    N_SCALAR,
+    NEGATE,
+    SPECIAL_CASES,
+    SentimentIntensityAnalyzer,
+)
+
+# --- Configuration ---
+DATABASE_FILE = 'yelp.db'
+# Agreement we promise with VADER's own compound score (4-decimal rounded).
+# Differences only come from float summation order, which can flip the last
+# rounded digit.
+TOLERANCE = 1e-3
+# Words the heuristics compare against; they need their own vocabulary ids.
+HEURISTIC_WORDS = [
+    'no', 'or', 'nor', 'kind', 'of', 'least', 'at', 'very',
+    'never', 'so', 'this', 'without', 'doubt', 'but',
+]
+# ---------------------
+
+
+class BatchSentimentAnalyzer:
+    """
+    Vectorized re-implementation of VADER's compound score.
+
+    Instead of walking each review word by word, a whole chunk of reviews is
+    split into one flat token array. Each distinct token is mapped once to a
+    vocabulary id, and lexicon valences, boosters, negations, ALL-CAPS
+    emphasis, the "no"/"least"/"never so" rules, special idioms and the "but"
+    rule are applied as NumPy operations over that array, using shifted copies
+    of it for the "previous/next word" lookups. Per-review sums come from a
+    single bincount.
+    """
+
+    def __init__(self, analyzer=None):
+        analyzer = analyzer or SentimentIntensityAnalyzer()
+
+        # VADER inserts a space before each emoji description; str.translate
+        # does the same in C and splits identically.
+        self._emoji_table = str.maketrans({
+            emoji: ' ' + description
+            for emoji, description in analyzer.emojis.items() if len(emoji) == 1
+        })
+
+        words = set(analyzer.lexicon) | set(BOOSTER_DICT) | set(NEGATE) | set(HEURISTIC_WORDS)
+        for phrase in itertools.chain(SPECIAL_CASES, BOOSTER_DICT):
+            words.update(phrase.split())
+        vocab = sorted(w for w in words if ' ' not in w)
+        self._ids = {word: i for i, word in enumerate(vocab)}
+        # One extra id for every other token (and for out-of-range shifts).
+        self._unk = len(vocab)
+        size = len(vocab) + 1
+
+        self._in_lexicon = np.zeros(size, dtype=bool)
+        self._valence = np.zeros(size)
+        self._is_booster = np.zeros(size, dtype=bool)
+        self._booster = np.zeros(size)
+        self._is_negation = np.zeros(size, dtype=bool)
+        for word, i in self._ids.items():
+            if word in analyzer.lexicon:
+                self._in_lexicon[i] = True
+                self._valence[i] = analyzer.lexicon[word]
+            if word in BOOSTER_DICT:
+                self._is_booster[i] = True
+                self._booster[i] = BOOSTER_DICT[word]
+        self._is_negation[[self._ids[w] for w in NEGATE]] = True
+
+        self._special = self._phrases(SPECIAL_CASES)
+        self._booster_bigrams = [
+            (ids, value) for ids, value in self._phrases(BOOSTER_DICT) if len(ids) == 2
+        ]
+
+    def _phrases(self, table):
+        """Multi-word entries of a VADER table as (tuple of ids, value)."""
+        return [
+            (tuple(self._ids[w] for w in phrase.split()), value)
+            for phrase, value in table.items() if ' ' in phrase
+        ]
+
+    def _id(self, word):
+        return self._ids[word]
+
+    # --- Tokenization ---
+    def _tokenize(self, texts):
+        """
+        Splits every text like VADER's SentiText and returns flat per-token
+        arrays plus per-text token counts. Token properties are computed once
+        per distinct token, not once per occurrence.
+        """
+        texts = [t.translate(self._emoji_table) for t in texts]
+        split_texts = [t.split() for t in texts]
+        lengths = np.fromiter((len(s) for s in split_texts), dtype=np.int64, count=len(split_texts))
+        raw = np.fromiter(itertools.chain.from_iterable(split_texts), dtype=object, count=int(lengths.sum()))
+
+        codes, uniques = pd.factorize(raw)
+        n_unique = len(uniques)
+        ids = np.empty(n_unique, dtype=np.int64)
+        upper = np.empty(n_unique, dtype=bool)
+        has_nt = np.empty(n_unique, dtype=bool)
+        for k, token in enumerate(uniques):
+            stripped = token.strip(string.punctuation)
+            if len(stripped) > 2:
+                token = stripped
+            lower = token.lower()
+            ids[k] = self._ids.get(lower, self._unk)
+            upper[k] = token.isupper()
+            has_nt[k] = "n't" in lower
+
+        return ids[codes], upper[codes], has_nt[codes], lengths, texts
+
+    # --- Scoring ---
+    def compound_scores(self, texts):
+        """Returns VADER-compatible compound scores (rounded to 4 decimals) for a sequence of texts."""
+        texts = ['' if t is None else str(t) for t in texts]
+        n_docs = len(texts)
+        w, upper, has_nt, lengths, texts = self._tokenize(texts)
+        n = len(w)
+
+        doc = np.repeat(np.arange(n_docs), lengths)
+        starts = np.cumsum(lengths) - lengths
+        token_pos = np.arange(n) - starts[doc]
+
+        # is_cap_diff: some, but not all, tokens of the review are ALL CAPS
+        n_upper = np.bincount(doc, weights=upper, minlength=n_docs)
+        doc_cap_diff = (n_upper > 0) & (n_upper < lengths)
+
+        L = self._in_lexicon
+        ID = self._id
+        unk = self._unk
+
+        # "but": remember where each review's first "but" is (VADER uses list.index)
+        is_but = w == ID('but')
+        no_but = np.iinfo(np.int64).max
+        first_but = np.full(n_docs, no_but)
+        np.minimum.at(first_but, doc[is_but], token_pos[is_but])
+
+        def neighbour(a, j, fill):
+            # a[i - j] for every selected token i (j < 0 looks ahead), or fill outside its review
+            p = pos - j
+            inside = (p >= 0) & (p < doc_len)
+            return np.where(inside, a[np.where(inside, sel - j, 0)], fill)
+
+        # Only lexicon words can carry sentiment, so every heuristic below runs on
+        # those tokens alone and gathers the words around them by index.
+        sel = np.flatnonzero(L[w] & ~self._is_booster[w])
+        doc_s, pos = doc[sel], token_pos[sel]
+        doc_len = lengths[doc_s]
+        kind_of = (w[sel] == ID('kind')) & (neighbour(w, -1, unk) == ID('of'))
+        sel, doc_s, pos, doc_len = sel[~kind_of], doc_s[~kind_of], pos[~kind_of], doc_len[~kind_of]
+
+        has_next1 = pos + 1 < doc_len
+        has_next2 = pos + 2 < doc_len
+        ws, p1, p2, p3 = w[sel], neighbour(w, 1, unk), neighbour(w, 2, unk), neighbour(w, 3, unk)
+        n1, n2 = neighbour(w, -1, unk), neighbour(w, -2, unk)
+        prev_ids = [p1, p2, p3]
+        prev_upper = [neighbour(upper, j, False) for j in (1, 2, 3)]
+        prev_nt = [neighbour(has_nt, j, False) for j in (1, 2, 3)]
+        cap_diff = doc_cap_diff[doc_s]
+
+        v = self._valence[ws].copy()
+        # "no" directly before a lexicon word negates that word instead of counting itself
+        v[(ws == ID('no')) & has_next1 & L[n1]] = 0.0
+        no_before = (
+            ((pos > 0) & (p1 == ID('no')))
+            | ((pos > 1) & (p2 == ID('no')))
+            | ((pos > 2) & (p3 == ID('no')) & ((p1 == ID('or')) | (p1 == ID('nor'))))
+        )
+        v = np.where(no_before, self._valence[ws] * N_SCALAR, v)
+
+        caps = upper[sel] & cap_diff
+        v = np.where(caps, np.where(v > 0, v + C_INCR, v - C_INCR), v)
+
+        def so_this(ids):
+            # "so" / "this" before a negated word intensifies it instead of flipping it
+            return (ids == ID('so')) | (ids == ID('this'))
+
+        for start_i in range(3):
+            prev = prev_ids[start_i]
+            cond = (pos > start_i) & ~L[prev]
+
+            # booster/dampener scalar from the preceding word (scalar_inc_dec)
+            s = np.where(v < 0, -self._booster[prev], self._booster[prev])
+            emphasis = self._is_booster[prev] & prev_upper[start_i] & cap_diff
+            s = s + np.where(emphasis, np.where(v > 0, C_INCR, -C_INCR), 0.0)
+            if start_i == 1:
+                s = s * 0.95
+            elif start_i == 2:
+                s = s * 0.9
+            v = np.where(cond, v + s, v)
+
+            # negation check
+            negated = self._is_negation[prev] | prev_nt[start_i]
+            if start_i == 0:
+                v = np.where(cond & negated, v * N_SCALAR, v)
+            else:
+                if start_i == 1:
+                    intensify = (p2 == ID('never')) & so_this(p1)
+                    no_doubt = (p2 == ID('without')) & (p1 == ID('doubt'))
+                else:
+                    intensify = ((p3 == ID('never')) & so_this(p2)) | so_this(p1)
+                    no_doubt = (p3 == ID('without')) & ((p2 == ID('doubt')) | (p1 == ID('doubt')))
+                v = np.where(cond & intensify, v * 1.25, v)
+                v = np.where(cond & ~intensify & ~no_doubt & negated, v * N_SCALAR, v)
+
+            if start_i == 2:
+                v = np.where(cond, self._idioms(v, ws, p1, p2, p3, n1, n2, has_next1, has_next2), v)
+
+        # "least" negates the following word, except in "at least" / "very least"
+        least = ~L[p1] & (p1 == ID('least'))
+        at_very = (p2 == ID('at')) | (p2 == ID('very'))
+        sentiments = np.where(((pos > 1) & least & ~at_very) | ((pos == 1) & least), v * N_SCALAR, v)
+
+        # "but": halve everything before the first "but", boost everything after it
+        bi = first_but[doc_s]
+        has_but = bi != no_but
+        factor = np.where(pos < bi, 0.5, np.where(pos > bi, 1.5, 1.0))
+        factor = np.where(has_but, factor, 1.0)
+        sentiments = self._but_quirk(sentiments, factor, has_but, doc_s)
+
+        # Per-review sums, punctuation emphasis and normalization
+        sum_s = np.bincount(doc_s, weights=sentiments, minlength=n_docs)
+        ep = np.minimum([t.count('!') for t in texts], 4) * 0.292
+        qm_count = np.array([t.count('?') for t in texts])
+        qm = np.where(qm_count > 3, 0.96, np.where(qm_count > 1, qm_count * 0.18, 0.0))
+        sum_s = sum_s + np.sign(sum_s) * (ep + qm)
+
+        compound = np.clip(sum_s / np.sqrt(sum_s * sum_s + 15), -1.0, 1.0)
+        compound[lengths == 0] = 0.0
+        return np.round(compound, 4)
+
+    @staticmethod
+    def _but_quirk(sentiments, factor, has_but, doc):
+        """
+        VADER's _but_check locates each value with list.index(), so when a
+        review repeats a valence (or a rescaled value collides with another)
+        the wrong entry gets rescaled. Zeros can't collide with anything, so
+        replaying the loop over the non-zero entries of just the "but" reviews
+        that have a collision reproduces VADER exactly.
+        """
+        scaled = sentiments * factor
+        idx = np.flatnonzero(has_but & (sentiments != 0))
+        if len(idx) < 2:
+            return scaled
+
+        # A review needs replaying only if some value, original or rescaled, occurs twice in it.
+        d = doc[idx]
+        changed = scaled[idx] != sentiments[idx]
+        key_doc = np.concatenate([d, d[changed]])
+        key_val = np.concatenate([sentiments[idx], scaled[idx][changed]])
+        order = np.lexsort((key_val, key_doc))
+        key_doc, key_val = key_doc[order], key_val[order]
+        dup = (key_doc[1:] == key_doc[:-1]) & (key_val[1:] == key_val[:-1])
+        idx = idx[np.isin(d, key_doc[1:][dup])]
+        if len(idx) == 0:
+            return scaled
+
+        all_values = sentiments[idx].tolist()
+        all_factors = factor[idx].tolist()
+        bounds = [0, *(np.flatnonzero(np.diff(doc[idx])) + 1).tolist(), len(idx)]
+        replayed = []
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            values = all_values[lo:hi]
+            factors = all_factors[lo:hi]
+            for k in range(len(values)):
+                si = values.index(values[k])
+                values[si] = values[k] * factors[si]
+            replayed.extend(values)
+
+        out = scaled.copy()
+        out[idx] = replayed
+        return out
+
+    def _idioms(self, v, w, p1, p2, p3, n1, n2, has_next1, has_next2):
+        """VADER's _special_idioms_check, evaluated for every token at once."""
+        def match(arrays, table):
+            out = np.full(len(v), np.nan)
+            for ids, value in table:
+                if len(ids) != len(arrays):
+                    continue
+                m = np.ones(len(v), dtype=bool)
+                for a, word_id in zip(arrays, ids):
+                    m &= a == word_id
+                out[m] = value
+            return out
+
+        # The first matching preceding sequence wins...
+        sequences = [(p1, w), (p2, p1, w), (p2, p1), (p3, p2, p1), (p3, p2)]
+        found = np.full(len(v), np.nan)
+        for arrays in reversed(sequences):
+            value = match(arrays, self._special)
+            found = np.where(np.isnan(value), found, value)
+        v = np.where(np.isnan(found), v, found)
+
+        # ...but a following sequence overrides it.
+        value = match((w, n1), self._special)
+        v = np.where(has_next1 & ~np.isnan(value), value, v)
+        value = match((w, n1, n2), self._special)
+        v = np.where(has_next2 & ~np.isnan(value), value, v)
+
+        # booster/dampener bi-grams such as "sort of" / "kind of"
+        for arrays in [(p3, p2), (p2, p1)]:
+            value = match(arrays, self._booster_bigrams)
+            v = np.where(np.isnan(value), v, v + value)
+        return v
+
+
+def validate(texts, analyzer=None, tolerance=TOLERANCE):
+    """
+    Scores texts with both engines and reports timings and agreement.
+    Returns a dict so callers (or the CLI below) can print or assert on it.
+    """
+    analyzer = analyzer or SentimentIntensityAnalyzer()
+    batch = BatchSentimentAnalyzer(analyzer)
+
+    start = time.perf_counter()
+    expected = np.array([analyzer.polarity_scores(t)['compound'] for t in texts])
+    vader_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    got = batch.compound_scores(texts)
+    batch_seconds = time.perf_counter() - start
+
+    diff = np.abs(got - expected)
+    return {
+        "n": len(texts),
+        "vader_seconds": vader_seconds,
+        "batch_seconds": batch_seconds,
+        "max_abs_diff": float(diff.max()) if len(diff) else 0.0,
+        "mean_abs_diff": float(diff.mean()) if len(diff) else 0.0,
+        "within_tolerance": float((diff <= tolerance).mean()) if len(diff) else 1.0,
+        "mean_compound_diff": float(abs(got.mean() - expected.mean())) if len(diff) else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Validate the batch sentiment engine against VADER on real reviews.")
+    parser.add_argument("--db", default=DATABASE_FILE, help="Path to sqlite3 database (default: yelp.db)")
+    parser.add_argument("--sample", type=int, default=20000, help="Number of reviews to compare (default: 20000)")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    sample = pd.read_sql(f"SELECT text FROM review LIMIT {int(args.sample)}", conn)
+    conn.close()
+
+    report = validate(sample['text'].fillna('').astype(str).tolist())
+    print(f"Compared {report['n']:,} reviews")
+    print(f"VADER: {report['vader_seconds']:.2f}s, batch: {report['batch_seconds']:.2f}s "
+          f"({report['vader_seconds'] / max(report['batch_seconds'], 1e-9):.1f}x)")
+    print(f"|diff| max {report['max_abs_diff']:.4f}, mean {report['mean_abs_diff']:.6f}; "
+          f"{report['within_tolerance']:.4%} within {TOLERANCE}")
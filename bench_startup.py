@@ -0,0 +1,93 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+# --- Configuration ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+HOST = '127.0.0.1'
+PORT = 8765
+TIMEOUT_SECONDS = 120
+# ---------------------
+
+IMPORT_SNIPPET = (
+    "import time; t = time.perf_counter(); import main; "
+    "print(time.perf_counter() - t)"
+)
+
+
+def measure_import(runs):
+    """Times `import main` in fresh interpreters (what every worker restart pays)."""
+    timings = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", IMPORT_SNIPPET],
+            cwd=BASE_DIR, capture_output=True, text=True, check=True,
+        )
+        timings.append(float(out.stdout.strip().splitlines()[-1]))
+    return timings
+
+
+def poll(url, until):
+    """Polls url until until(status_code, body) is true; returns elapsed seconds or None."""
+    start = time.perf_counter()
+    while time.perf_counter() - start < TIMEOUT_SECONDS:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as resp:
+                status, body = resp.status, resp.read()
+        except urllib.error.HTTPError as e:
+            status, body = e.code, e.read()
+        except (urllib.error.URLError, ConnectionError, TimeoutError):
+            time.sleep(0.02)
+            continue
+        if until(status, body):
+            return time.perf_counter() - start
+        time.sleep(0.02)
+    return None
+
+
+def measure_server():
+    """
+    Starts uvicorn and reports two numbers:
+    time until the socket answers at all, and time until the model is loaded
+    (or known to be missing) according to /ready.
+    """
+    cmd = [sys.executable, "-m", "uvicorn", "main:app", "--host", HOST, "--port", str(PORT)]
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=BASE_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        url = f"http://{HOST}:{PORT}/ready"
+        first = poll(url, lambda status, body: True)
+        first_at = time.perf_counter() - start
+        model = poll(url, lambda status, body: json.loads(body)["model"]["status"] != "loading")
+        model_at = time.perf_counter() - start
+        return {
+            "first_response_seconds": None if first is None else round(first_at, 3),
+            "model_settled_seconds": None if model is None else round(model_at, 3),
+        }
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark main.py import time and server start-up.")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh-interpreter import runs (default: 5)")
+    parser.add_argument("--no-server", action="store_true", help="Only measure the import time")
+    args = parser.parse_args()
+
+    timings = measure_import(args.runs)
+    print(f"import main: best {min(timings):.3f}s, mean {sum(timings) / len(timings):.3f}s over {args.runs} runs")
+
+    if not args.no_server:
+        result = measure_server()
+        print(f"uvicorn first response: {result['first_response_seconds']}s")
+        print(f"model loaded/settled:   {result['model_settled_seconds']}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,15 @@
+import argparse
 import sqlite3
 import time
 
+import profiling
+
 DATABASE_FILE = 'yelp.db'
 
-def add_index():
+def add_index(profiler=None):
+    profiler = profiler or profiling.disabled()
     print(f"Connecting to {DATABASE_FILE}...")
-    conn = sqlite3.connect(DATABASE_FILE)
+    conn = profiler.attach(sqlite3.connect(DATABASE_FILE))
     cursor = conn.cursor()
 
     print("Starting to build index on 'review(business_id)'...")
@@ -15,8 +19,9 @@ def add_index():
 
     try:
         # Create the index
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_review_business_id ON review (business_id)")
-        conn.commit()
+        with profiler.phase('write'):
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_review_business_id ON review (business_id)")
+            conn.commit()
 
         end_time = time.time()
         print(f"\n--- ✅ Success! ---")
@@ -28,4 +33,9 @@ def add_index():
         conn.close()
 
 if __name__ == "__main__":
-    add_index()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Build the review(business_id) index.")
+    profiling.add_profile_argument(parser)
+    args = parser.parse_args()
+
+    with profiling.JobProfiler.from_args('create_index', args) as profiler:
+        add_index(profiler=profiler)
@@ -1,6 +1,9 @@
+import argparse
 import sqlite3
 import time
 
+import profiling
+
 DATABASE_FILE = 'yelp.db'
 
 # Define all the indexes we want in our database
@@ -11,9 +14,10 @@ INDEXES_TO_CREATE = [
     ('idx_user_clusters_user_id', 'user_clusters', 'user_id'),
 ]
 
-def add_indexes():
+def add_indexes(profiler=None):
+    profiler = profiler or profiling.disabled()
     print(f"Connecting to {DATABASE_FILE} to ensure all indexes are built...")
-    conn = sqlite3.connect(DATABASE_FILE)
+    conn = profiler.attach(sqlite3.connect(DATABASE_FILE))
     cursor = conn.cursor()
 
     for index_name, table_name, column_name in INDEXES_TO_CREATE:
@@ -30,8 +34,9 @@ def add_indexes():
         start_time = time.time()
         
         try:
-            cursor.execute(f"CREATE INDEX {index_name} ON {table_name} ({column_name})")
-            conn.commit()
+            with profiler.phase(f'write:{index_name}'):
+                cursor.execute(f"CREATE INDEX {index_name} ON {table_name} ({column_name})")
+                conn.commit()
             end_time = time.time()
             print(f"    -> Success! Created in {end_time - start_time:.2f} seconds.")
         except Exception as e:
@@ -41,4 +46,9 @@ def add_indexes():
     conn.close()
 
 if __name__ == "__main__":
-    add_indexes()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Ensure all serving indexes exist.")
+    profiling.add_profile_argument(parser)
+    args = parser.parse_args()
+
+    with profiling.JobProfiler.from_args('create_indexes', args) as profiler:
+        add_indexes(profiler=profiler)
@@ -198,6 +198,43 @@ document.addEventListener('DOMContentLoaded', () => {
                 }, index * 50);
             });
 
+            // Populate similar restaurants; clicking one loads its dashboard
+            const similarBody = document.querySelector('#similar-table tbody');
+            similarBody.innerHTML = '';
+
+            (data.similar_restaurants || []).forEach((row, index) => {
+                const tr = document.createElement('tr');
+                tr.className = 'similar-row';
+                tr.title = row.business_id;
+                tr.style.opacity = '0';
+                tr.style.transform = 'translateY(10px)';
+
+                const tdName = document.createElement('td');
+                tdName.textContent = row.city ? `${row.name} (${row.city})` : row.name;
+
+                const tdStars = document.createElement('td');
+                tdStars.textContent = row.stars != null ? row.stars : 'N/A';
+
+                const tdScore = document.createElement('td');
+                tdScore.textContent = (row.similarity * 100).toFixed(0) + '%';
+                tdScore.style.fontWeight = '600';
+
+                tr.appendChild(tdName);
+                tr.appendChild(tdStars);
+                tr.appendChild(tdScore);
+                tr.addEventListener('click', () => {
+                    restaurantInput.value = row.business_id;
+                    searchBtn.click();
+                });
+                similarBody.appendChild(tr);
+
+                setTimeout(() => {
+                    tr.style.transition = 'all 0.3s ease';
+                    tr.style.opacity = '1';
+                    tr.style.transform = 'translateY(0)';
+                }, index * 50);
+            });
+
             hideSpinner();
             showResults();
 
@@ -1,7 +1,10 @@
+import argparse
 import pandas as pd
 import sqlite3
 import os
 
+import profiling
+
 # --- Configuration ---
 JSON_FILE = 'yelp_academic_dataset_business.json' 
 DATABASE_FILE = 'yelp.db'
@@ -9,11 +12,12 @@ TABLE_NAME = 'business'
 CHUNK_SIZE = 50000 
 # ---------------------
 
-def import_business_data():
+def import_business_data(profiler=None):
     """
     Reads the business.json file and imports it into
     the 'business' table in our SQLite database.
     """
+    profiler = profiler or profiling.disabled()
     
     if os.path.exists(DATABASE_FILE):
         print(f"'{DATABASE_FILE}' already exists. Deleting to start fresh.")
@@ -27,23 +31,25 @@ def import_business_data():
 
     print(f"Starting import of '{JSON_FILE}'...")
     
-    conn = sqlite3.connect(DATABASE_FILE)
+    conn = profiler.attach(sqlite3.connect(DATABASE_FILE))
     
     try:
         reader = pd.read_json(JSON_FILE, lines=True, chunksize=CHUNK_SIZE)
         
         total_rows = 0
-        for i, chunk in enumerate(reader):
+        for i, chunk in enumerate(profiler.iter_phase(reader, 'load')):
             # Convert all object columns to strings
             # Convert columns that are dicts into simple strings (JSON strings)
             # This solves the "type 'dict' is not supported" error
-            if 'attributes' in chunk.columns:
-                chunk['attributes'] = chunk['attributes'].astype(str)
-            if 'hours' in chunk.columns:
-                chunk['hours'] = chunk['hours'].astype(str)
+            with profiler.phase('transform'):
+                if 'attributes' in chunk.columns:
+                    chunk['attributes'] = chunk['attributes'].astype(str)
+                if 'hours' in chunk.columns:
+                    chunk['hours'] = chunk['hours'].astype(str)
 
             # Now, write this cleaned chunk to the 'business' table
-            chunk.to_sql(TABLE_NAME, conn, if_exists='append', index=False)
+            with profiler.phase('write'):
+                chunk.to_sql(TABLE_NAME, conn, if_exists='append', index=False)
             
             total_rows += len(chunk)
             print(f"Processed chunk {i + 1} ({total_rows} total rows)")
@@ -60,4 +66,9 @@ def import_business_data():
 
 # --- This makes the script runnable ---
 if __name__ == "__main__":
-    import_business_data()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Import business.json into the 'business' table.")
+    profiling.add_profile_argument(parser)
+    args = parser.parse_args()
+
+    with profiling.JobProfiler.from_args('ingest_business', args) as profiler:
+        import_business_data(profiler=profiler)
@@ -1,8 +1,11 @@
+import argparse
 import pandas as pd
 import sqlite3
 import os
 import time
 
+import profiling
+
 # --- Configuration ---
 JSON_FILE = 'yelp_academic_dataset_review.json' # ⚠️ Double-check this filename!
 DATABASE_FILE = 'yelp.db'
@@ -10,11 +13,12 @@ TABLE_NAME = 'review'
 CHUNK_SIZE = 100000 
 # ---------------------
 
-def import_review_data():
+def import_review_data(profiler=None):
     """
     Reads the massive review.json file in chunks and appends it
     to the 'review' table in our existing SQLite database.
     """
+    profiler = profiler or profiling.disabled()
     
     if not os.path.exists(JSON_FILE):
         print(f"Error: File not found at '{JSON_FILE}'")
@@ -31,15 +35,16 @@ def import_review_data():
     
     start_time = time.time()
     
-    conn = sqlite3.connect(DATABASE_FILE)
+    conn = profiler.attach(sqlite3.connect(DATABASE_FILE))
     
     try:
         reader = pd.read_json(JSON_FILE, lines=True, chunksize=CHUNK_SIZE)
         
         total_rows = 0
-        for i, chunk in enumerate(reader):
+        for i, chunk in enumerate(profiler.iter_phase(reader, 'load')):
             # This appends to the 'review' table in the *same* yelp.db
-            chunk.to_sql(TABLE_NAME, conn, if_exists='append', index=False)
+            with profiler.phase('write'):
+                chunk.to_sql(TABLE_NAME, conn, if_exists='append', index=False)
             
             total_rows += len(chunk)
             elapsed_minutes = (time.time() - start_time) / 60
@@ -59,4 +64,9 @@ def import_review_data():
 
 # --- Main execution ---
 if __name__ == "__main__":
-    import_review_data()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Append review.json to the 'review' table.")
+    profiling.add_profile_argument(parser)
+    args = parser.parse_args()
+
+    with profiling.JobProfiler.from_args('ingest_review', args) as profiler:
+        import_review_data(profiler=profiler)
@@ -1,8 +1,11 @@
+import argparse
 import pandas as pd
 import sqlite3
 import os
 import time
 
+import profiling
+
 # --- Configuration ---
 JSON_FILE = 'yelp_academic_dataset_user.json'
 DATABASE_FILE = 'yelp.db'
@@ -10,11 +13,12 @@ TABLE_NAME = 'user'
 CHUNK_SIZE = 100000 
 # ---------------------
 
-def import_user_data():
+def import_user_data(profiler=None):
     """
     Reads the user.json file in chunks, flattens complex columns, 
     and appends it to the 'user' table.
     """
+    profiler = profiler or profiling.disabled()
     
     if not os.path.exists(JSON_FILE):
         print(f"Error: File not found at '{JSON_FILE}'")
@@ -31,22 +35,24 @@ def import_user_data():
     
     start_time = time.time()
     
-    conn = sqlite3.connect(DATABASE_FILE)
+    conn = profiler.attach(sqlite3.connect(DATABASE_FILE))
     
     try:
         reader = pd.read_json(JSON_FILE, lines=True, chunksize=CHUNK_SIZE)
         
         total_rows = 0
-        for i, chunk in enumerate(reader):
+        for i, chunk in enumerate(profiler.iter_phase(reader, 'load')):
             
             
-            for col in chunk.columns:
-                if chunk[col].dtype == 'object':
-                    chunk[col] = chunk[col].astype(str)
+            with profiler.phase('transform'):
+                for col in chunk.columns:
+                    if chunk[col].dtype == 'object':
+                        chunk[col] = chunk[col].astype(str)
             # --- 💡 NEW FIX END 💡 ---
 
             # This appends to the 'user' table
-            chunk.to_sql(TABLE_NAME, conn, if_exists='append', index=False)
+            with profiler.phase('write'):
+                chunk.to_sql(TABLE_NAME, conn, if_exists='append', index=False)
             
             total_rows += len(chunk)
             elapsed_minutes = (time.time() - start_time) / 60
@@ -66,4 +72,9 @@ def import_user_data():
 
 # --- Main execution ---
 if __name__ == "__main__":
-    import_user_data()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Append user.json to the 'user' table.")
+    profiling.add_profile_argument(parser)
+    args = parser.parse_args()
+
+    with profiling.JobProfiler.from_args('ingest_user', args) as profiler:
+        import_user_data(profiler=profiler)
@@ -1,57 +1,224 @@
-import pandas as pd
+import asyncio
+import hashlib
+import mimetypes
 import sqlite3
 import os
-import joblib
-from fastapi import FastAPI, HTTPException
+import time
+from contextlib import asynccontextmanager
+from email.utils import formatdate, parsedate_to_datetime
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse
 from pydantic import BaseModel
+from starlette.datastructures import Headers
+from starlette.staticfiles import NotModifiedResponse
 
 # --- Configuration ---
 BASE_DIR = os.path.dirname(__file__)
 DATABASE_FILE = os.path.join(BASE_DIR, 'yelp.db')
 MODEL_FILE = os.path.join(BASE_DIR, 'star_classifier.joblib')
+REQUIRED_TABLES = ('business', 'business_nlp', 'review', 'user_clusters')
+WARMUP_TEXT = "The food was great and the service was friendly."
+# Precomputed data only changes on a batch run, so clients may reuse a
+# restaurant payload briefly and then revalidate it with If-None-Match.
+API_CACHE_CONTROL = "public, max-age=300, must-revalidate"
+# Asset URLs aren't fingerprinted, so keep this short; ETags make revalidation cheap.
+STATIC_CACHE_CONTROL = "public, max-age=3600"
+GZIP_MIN_SIZE = 1000
 # ---------------------
 
 # --- Global Objects ---
-# Load the pre-trained classifier model into memory ONCE on startup.
-# This is a heavy object, and we don't want to load it for every request.
-try:
-    CLASSIFIER_MODEL = joblib.load(MODEL_FILE)
-    print(f"Successfully loaded classifier model from '{MODEL_FILE}'")
-except FileNotFoundError:
-    print(f"ERROR: '{MODEL_FILE}' not found. The /predict_star endpoint will not work.")
-    print("Run train_classifier.py to create the model file.")
-    CLASSIFIER_MODEL = None
-except Exception as e:
-    print(f"An error occurred loading the model: {e}")
-    CLASSIFIER_MODEL = None
+# The classifier is a heavy object: we load it ONCE per process, but in a
+# background thread so uvicorn can accept connections immediately.
+# Until it is ready, /predict_star answers with the keyword heuristic.
+CLASSIFIER_MODEL = None
+MODEL_STATUS = "loading"   # loading -> ready | missing | error
+MODEL_LOAD_SECONDS = None
 # ---------------------
 
 # --- Helper Functions ---
 def get_db_connection():
     """Helper function to create and return a new DB connection."""
     conn = sqlite3.connect(DATABASE_FILE)
+    conn.row_factory = sqlite3.Row
     return conn
+
+
+def load_classifier_model():
+    """
+    Loads the classifier and runs one warmup prediction.
+    joblib (and, through the pickle, scikit-learn) is imported here rather than
+    at module load, which keeps worker start-up to the cost of FastAPI itself.
+    """
+    global CLASSIFIER_MODEL, MODEL_STATUS, MODEL_LOAD_SECONDS
+    start = time.perf_counter()
+    try:
+        import joblib
+        model = joblib.load(MODEL_FILE)
+        # The first predict call pays for lazy allocations inside the pipeline;
+        # do it here instead of on a user's request.
+        model.predict_proba([WARMUP_TEXT])
+    except FileNotFoundError:
+        print(f"ERROR: '{MODEL_FILE}' not found. /predict_star will use the keyword heuristic.")
+        print("Run star_classifier.py to create the model file.")
+        MODEL_STATUS = "missing"
+        return
+    except Exception as e:
+        print(f"An error occurred loading the model: {e}")
+        MODEL_STATUS = "error"
+        return
+
+    CLASSIFIER_MODEL = model
+    MODEL_LOAD_SECONDS = time.perf_counter() - start
+    MODEL_STATUS = "ready"
+    print(f"Successfully loaded classifier model from '{MODEL_FILE}' in {MODEL_LOAD_SECONDS:.2f}s")
+
+
+def check_database():
+    """Returns (ok, detail) for the readiness probe without touching large tables."""
+    if not os.path.exists(DATABASE_FILE):
+        return False, f"'{DATABASE_FILE}' not found"
+    try:
+        conn = sqlite3.connect(f"file:{DATABASE_FILE}?mode=ro", uri=True)
+        try:
+            rows = conn.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall()
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        return False, str(e)
+    missing = sorted(set(REQUIRED_TABLES) - {r[0] for r in rows})
+    if missing:
+        return False, f"missing tables: {', '.join(missing)}"
+    return True, "ok"
+
+
+def get_data_version():
+    """
+    Returns the mtime (ns) of the database file, or None if it's missing.
+    Every ingest/precompute run writes to yelp.db, so this changes exactly
+    when the data behind the API can have changed.
+    """
+    try:
+        return os.stat(DATABASE_FILE).st_mtime_ns
+    except OSError:
+        return None
+
+
+def cache_validators(restaurant_id, data_version):
+    """Builds the ETag / Last-Modified / Cache-Control headers for one restaurant payload."""
+    digest = hashlib.blake2b(f"{restaurant_id}:{data_version}".encode(), digest_size=8).hexdigest()
+    return {
+        # Weak, because GZipMiddleware may change the bytes on the wire.
+        "ETag": f'W/"{digest}"',
+        "Last-Modified": formatdate(data_version / 1e9, usegmt=True),
+        "Cache-Control": API_CACHE_CONTROL,
+    }
+
+
+def is_not_modified(request_headers, validators):
+    """Conditional GET check; If-None-Match takes precedence over If-Modified-Since."""
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        # "*" is deliberately not honoured: this runs before the row lookup,
+        # so it would turn a missing restaurant into a 304 instead of a 404.
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return validators["ETag"].removeprefix("W/") in tags
+
+    if_modified_since = request_headers.get("if-modified-since")
+    if if_modified_since is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+            last_modified = parsedate_to_datetime(validators["Last-Modified"])
+        except (TypeError, ValueError):
+            return False
+        return last_modified <= since
+    return False
+
+
+class APIGZipMiddleware(GZipMiddleware):
+    """
+    GZipMiddleware for everything except the file routes. Compressing a
+    FileResponse on the fly would keep its strong ETag and answer Range
+    requests with a gzip body that doesn't match the Content-Range, so files
+    go out as identity or as a precompressed .gz (see CachedStaticFiles).
+    """
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and (scope["path"] == "/" or scope["path"].startswith("/static/")):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+class CachedStaticFiles(StaticFiles):
+    """
+    StaticFiles with a Cache-Control header and precompressed variants:
+    if the client accepts gzip and a fresh `<file>.gz` sits next to the file
+    (see precompress_static.py), that is sent instead of compressing per request.
+    Without one the plain file is sent; /static is never compressed on the fly.
+    """
+
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        request_headers = Headers(scope=scope)
+        gz_path = f"{full_path}.gz"
+        gz_stat = None
+        if "gzip" in request_headers.get("accept-encoding", ""):
+            try:
+                gz_stat = os.stat(gz_path)
+            except OSError:
+                pass
+
+        if gz_stat is not None and gz_stat.st_mtime >= stat_result.st_mtime:
+            media_type = mimetypes.guess_type(str(full_path))[0] or "text/plain"
+            response = FileResponse(gz_path, status_code=status_code, media_type=media_type,
+                                    stat_result=gz_stat, headers={"Content-Encoding": "gzip"})
+        else:
+            response = FileResponse(full_path, status_code=status_code, stat_result=stat_result)
+        response.headers["Cache-Control"] = STATIC_CACHE_CONTROL
+        response.headers.add_vary_header("Accept-Encoding")
+
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Fire and forget: startup completes (and the socket is served) right away.
+    loader = asyncio.create_task(asyncio.to_thread(load_classifier_model))
+    yield
+    loader.cancel()
 # ---------------------
 
 # --- FastAPI App Initialization ---
 app = FastAPI(
     title="Restaurant Review Analyzer",
     description="An end-to-end API serving pre-computed NLP, clustering, and classification models.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
+# Compresses larger API (JSON) responses; the file routes are left alone.
+app.add_middleware(APIGZipMiddleware, minimum_size=GZIP_MIN_SIZE)
 # ---------------------
 
 # --- API Endpoints ---
 
 @app.get("/restaurant/{restaurant_id}", tags=["Dashboard Data"])
-async def get_restaurant_data(restaurant_id: str):
+async def get_restaurant_data(restaurant_id: str, request: Request, response: Response):
     """
     The main dashboard endpoint.
     It is extremely fast because it only reads pre-computed results.
-    It uses an efficient 2-query pattern to minimize database calls.
+    It uses an efficient 3-query pattern to minimize database calls.
+    Responses carry an ETag/Last-Modified tied to the data version, so a
+    revalidating browser gets a 304 without touching the database at all.
     """
+    data_version = get_data_version()
+    validators = cache_validators(restaurant_id, data_version) if data_version is not None else None
+    if validators and is_not_modified(request.headers, validators):
+        # Same Vary as the (possibly gzipped) 200 it stands in for.
+        return Response(status_code=304, headers={**validators, "Vary": "Accept-Encoding"})
+
     print(f"Fetching pre-computed data for restaurant_id: {restaurant_id}")
     
     conn = get_db_connection()
@@ -70,13 +237,13 @@ async def get_restaurant_data(restaurant_id: str):
         LEFT JOIN business_nlp n ON b.business_id = n.business_id
         WHERE b.business_id = ?
         """
-        main_df = pd.read_sql(main_query, conn, params=(restaurant_id,))
+        main_row = conn.execute(main_query, (restaurant_id,)).fetchone()
         
-        if main_df.empty:
+        if main_row is None:
             raise HTTPException(status_code=404, detail="Restaurant not found")
             
         # Convert the single-row result to our main dictionary
-        restaurant_data = main_df.to_dict('records')[0]
+        restaurant_data = dict(main_row)
 
         # === QUERY 2: GET PRE-COMPUTED CLUSTER DISTRIBUTION ===
         # This query is also fast because it uses an index on review(business_id)
@@ -89,20 +256,41 @@ async def get_restaurant_data(restaurant_id: str):
         GROUP BY uc.cluster_label
         ORDER BY visit_count DESC
         """
-        cluster_df = pd.read_sql(cluster_query, conn, params=(restaurant_id,))
+        cluster_rows = conn.execute(cluster_query, (restaurant_id,)).fetchall()
         
         # Add cluster data, mapped to frontend expected keys: customer_archetypes [{type, count}]
-        if not cluster_df.empty:
-            archetypes = []
-            for _, row in cluster_df.iterrows():
-                archetypes.append({
-                    "type": int(row['cluster_label']),
-                    "count": int(row['visit_count'])
-                })
-            restaurant_data['customer_archetypes'] = archetypes
-        else:
-            restaurant_data['customer_archetypes'] = []
+        restaurant_data['customer_archetypes'] = [
+            {"type": int(row['cluster_label']), "count": int(row['visit_count'])}
+            for row in cluster_rows
+        ]
 
+        # === QUERY 3: GET PRE-COMPUTED SIMILAR RESTAURANTS ===
+        # One range scan on business_neighbors' (business_id, rank) primary key;
+        # the neighbor's name/city/stars are stored inline, so there's no join.
+        similar_query = """
+        SELECT neighbor_id, neighbor_name, neighbor_city, neighbor_stars, score
+        FROM business_neighbors
+        WHERE business_id = ?
+        ORDER BY rank
+        """
+        try:
+            similar_rows = conn.execute(similar_query, (restaurant_id,)).fetchall()
+        except sqlite3.OperationalError:
+            # precompute_similar.py hasn't been run yet
+            similar_rows = []
+        restaurant_data['similar_restaurants'] = [
+            {
+                "business_id": row['neighbor_id'],
+                "name": row['neighbor_name'],
+                "city": row['neighbor_city'],
+                "stars": row['neighbor_stars'],
+                "similarity": row['score'],
+            }
+            for row in similar_rows
+        ]
+
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"A database error occurred: {e}")
         raise HTTPException(status_code=500, detail="Internal Server Error")
@@ -131,6 +319,8 @@ async def get_restaurant_data(restaurant_id: str):
     if 'name' in restaurant_data and 'restaurant_name' not in restaurant_data:
         restaurant_data['restaurant_name'] = restaurant_data['name']
 
+    if validators:
+        response.headers.update(validators)
     return restaurant_data
 
 
@@ -142,7 +332,8 @@ class ReviewInput(BaseModel):
 async def predict_star_rating(review: ReviewInput):
     """
     Predict 1-star or 5-star based on the loaded classifier.
-    If the model isn't available, use a small keyword-based heuristic fallback.
+    If the model isn't available (or is still loading), use a small
+    keyword-based heuristic fallback.
     """
     text = review.text if isinstance(review.text, str) else ""
 
@@ -174,11 +365,29 @@ async def predict_star_rating(review: ReviewInput):
     return {"predicted_star": int(stars), "confidence": float(confidence)}
 
 
+@app.get("/ready", tags=["Health"])
+async def readiness_probe():
+    """
+    Readiness probe for load balancers / orchestrators.
+    Returns 503 while the classifier is still loading or the database is unusable.
+    A missing model is reported but does not block readiness, since
+    /predict_star keeps serving with the heuristic.
+    """
+    db_ok, db_detail = check_database()
+    ready = db_ok and MODEL_STATUS != "loading"
+    body = {
+        "ready": ready,
+        "model": {"status": MODEL_STATUS, "load_seconds": MODEL_LOAD_SECONDS},
+        "database": {"ok": db_ok, "detail": db_detail},
+    }
+    return JSONResponse(body, status_code=200 if ready else 503)
+
+
 # --- Frontend Serving ---
 # This section serves the static HTML/CSS/JS files for the dashboard.
-app.mount("/static", StaticFiles(directory="frontend"), name="static")
+app.mount("/static", CachedStaticFiles(directory="frontend"), name="static")
 
 @app.get("/", include_in_schema=False)
 async def read_index():
-    """Serves the main index.html dashboard page."""
-    return FileResponse('frontend/index.html')
+    """Serves the main index.html dashboard page (always revalidated, so asset changes show up)."""
+    return FileResponse('frontend/index.html', headers={"Cache-Control": "no-cache"})
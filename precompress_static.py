@@ -0,0 +1,38 @@
+import argparse
+import gzip
+import os
+import shutil
+
+# --- Configuration ---
+STATIC_DIR = 'frontend'
+EXTENSIONS = ('.css', '.js', '.html', '.svg', '.ico', '.json')
+COMPRESS_LEVEL = 9
+# ---------------------
+
+def precompress(static_dir=STATIC_DIR):
+    """
+    Writes a maximally-compressed `<file>.gz` next to every text asset.
+    main.py's /static mount serves these to gzip-capable clients, so the
+    server never spends CPU compressing the bundle at request time.
+    Re-run after editing the frontend; stale .gz files are ignored by the server.
+    """
+    saved = 0
+    for root, _, files in os.walk(static_dir):
+        for name in files:
+            if not name.endswith(EXTENSIONS):
+                continue
+            src = os.path.join(root, name)
+            dst = src + '.gz'
+            with open(src, 'rb') as f_in, gzip.GzipFile(dst, 'wb', compresslevel=COMPRESS_LEVEL, mtime=0) as f_out:
+                shutil.copyfileobj(f_in, f_out)
+            before, after = os.path.getsize(src), os.path.getsize(dst)
+            saved += before - after
+            print(f"{src}: {before:,} -> {after:,} bytes")
+    print(f"Done. Saved {saved:,} bytes per cold load.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompress static frontend assets with gzip.")
+    parser.add_argument("--dir", default=STATIC_DIR, help="Static directory (default: frontend)")
+    args = parser.parse_args()
+    precompress(args.dir)
@@ -1,3 +1,4 @@
+import argparse
 import pandas as pd
 import sqlite3
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
@@ -6,7 +7,11 @@ import re
 from tqdm import tqdm
 import numpy as np
 
+import profiling
+from batch_sentiment import BatchSentimentAnalyzer
+
 DATABASE_FILE = 'yelp.db'
+SENTIMENT_CHUNK_SIZE = 100000
 
 def get_top_keywords(texts, n_terms=5):
     """
@@ -37,8 +42,34 @@ def get_top_keywords(texts, n_terms=5):
     top_n_indices = top_n_indices[::-1]
     return [feature_names[i] for i in top_n_indices]
 
-def precompute_nlp_data():
-    conn = sqlite3.connect(DATABASE_FILE)
+def batch_positivity_scores(conn, sia, profiler):
+    """
+    Scores every review with the vectorized engine in large chunks and
+    returns {business_id: mean compound score}. One sequential pass over the
+    review table replaces ~7M individual polarity_scores() calls.
+    """
+    scorer = BatchSentimentAnalyzer(sia)
+    reader = pd.read_sql("SELECT business_id, text FROM review", conn, chunksize=SENTIMENT_CHUNK_SIZE)
+
+    totals = []
+    for chunk in tqdm(profiler.iter_phase(reader, 'load'), desc="Scoring reviews", unit="chunk"):
+        with profiler.phase('transform'):
+            chunk['compound'] = scorer.compound_scores(chunk['text'].fillna('').astype(str).tolist())
+            totals.append(chunk.groupby('business_id')['compound'].agg(['sum', 'count']))
+
+    if not totals:
+        return {}
+    combined = pd.concat(totals).groupby(level=0).sum()
+    return (combined['sum'] / combined['count']).to_dict()
+
+def precompute_nlp_data(sentiment='vader', profiler=None):
+    """
+    sentiment selects the scorer for positivity_score: 'vader' calls
+    polarity_scores() per review, 'batch' uses BatchSentimentAnalyzer
+    (same scores, see batch_sentiment.py for the validation).
+    """
+    profiler = profiler or profiling.disabled()
+    conn = profiler.attach(sqlite3.connect(DATABASE_FILE))
     cursor = conn.cursor()
 
     # 1. Create the new table
@@ -52,10 +83,15 @@ def precompute_nlp_data():
     """)
 
     # 2. Get all businesses to loop over
-    business_df = pd.read_sql("SELECT business_id, name FROM business", conn)
+    with profiler.phase('load'):
+        business_df = pd.read_sql("SELECT business_id, name FROM business", conn)
 
     # 3. Load VADER
     sia = SentimentIntensityAnalyzer()
+    positivity_by_business = None
+    if sentiment == 'batch':
+        print("Scoring all reviews with the batch sentiment engine...")
+        positivity_by_business = batch_positivity_scores(conn, sia, profiler)
 
     print(f"Starting NLP pre-computation for {len(business_df)} businesses...")
 
@@ -64,15 +100,19 @@ def precompute_nlp_data():
         business_id = row['business_id']
 
         # a. Fetch all reviews for this business_id
-        reviews_df = pd.read_sql("SELECT text, stars FROM review WHERE business_id = ?", conn, params=(business_id,))
+        with profiler.phase('load'):
+            reviews_df = pd.read_sql("SELECT text, stars FROM review WHERE business_id = ?", conn, params=(business_id,))
 
         # b. Calculate positivity_score (handle 0 reviews!)
         positivity_score = 0.0
-        if not reviews_df.empty:
-            # ensure text column is string and fill missing
-            texts_series = reviews_df['text'].fillna('').astype(str)
-            scores = texts_series.apply(lambda t: sia.polarity_scores(t)['compound'])
-            positivity_score = float(scores.mean()) if not scores.empty else 0.0
+        with profiler.phase('transform'):
+            if positivity_by_business is not None:
+                positivity_score = float(positivity_by_business.get(business_id, 0.0))
+            elif not reviews_df.empty:
+                # ensure text column is string and fill missing
+                texts_series = reviews_df['text'].fillna('').astype(str)
+                scores = texts_series.apply(lambda t: sia.polarity_scores(t)['compound'])
+                positivity_score = float(scores.mean()) if not scores.empty else 0.0
 
         # c. Calculate keywords (handle 0 reviews!)
         positive_texts = []
@@ -81,26 +121,36 @@ def precompute_nlp_data():
             positive_texts = reviews_df[reviews_df['stars'].isin([4, 5])]['text'].dropna().astype(str).tolist()
             negative_texts = reviews_df[reviews_df['stars'].isin([1, 2])]['text'].dropna().astype(str).tolist()
 
-        pos_keywords_list = get_top_keywords(positive_texts)
-        neg_keywords_list = get_top_keywords(negative_texts)
+        with profiler.phase('fit'):
+            pos_keywords_list = get_top_keywords(positive_texts)
+            neg_keywords_list = get_top_keywords(negative_texts)
 
         # ensure keywords are strings before joining
         pos_keywords_str = ",".join(map(str, pos_keywords_list))
         neg_keywords_str = ",".join(map(str, neg_keywords_list))
 
         # e. Insert results into the new table
-        cursor.execute(
-            """
-            INSERT OR REPLACE INTO business_nlp (business_id, positivity_score, positive_keywords, negative_keywords)
-            VALUES (?, ?, ?, ?)
-            """,
-            (business_id, positivity_score, pos_keywords_str, neg_keywords_str),
-        )
+        with profiler.phase('write'):
+            cursor.execute(
+                """
+                INSERT OR REPLACE INTO business_nlp (business_id, positivity_score, positive_keywords, negative_keywords)
+                VALUES (?, ?, ?, ?)
+                """,
+                (business_id, positivity_score, pos_keywords_str, neg_keywords_str),
+            )
 
     # 5. Commit all changes and close
-    conn.commit()
+    with profiler.phase('write'):
+        conn.commit()
     conn.close()
     print("NLP pre-computation complete.")
 
 if __name__ == "__main__":
-    precompute_nlp_data()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Precompute per-business sentiment and keywords into 'business_nlp'.")
+    parser.add_argument("--sentiment", choices=["vader", "batch"], default="vader",
+                        help="Sentiment scorer: per-review VADER (default) or the vectorized batch engine")
+    profiling.add_profile_argument(parser)
+    args = parser.parse_args()
+
+    with profiling.JobProfiler.from_args('precompute_nlp', args) as profiler:
+        precompute_nlp_data(sentiment=args.sentiment, profiler=profiler)
@@ -0,0 +1,244 @@
+import argparse
+import os
+import sqlite3
+import time
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+import profiling
+
+# --- Configuration ---
+DATABASE_FILE = 'yelp.db'
+TABLE_NAME = 'business_neighbors'
+TOP_K = 10
+# Query x candidate pairs per sparse product. A block's product can hold up to
+# this many non-zeros, so it (not a fixed row count) bounds memory per worker.
+PAIR_BUDGET = 10_000_000
+N_JOBS = min(4, os.cpu_count() or 1)   # every worker holds one block product at a time
+# Yelp's top-level categories. "Restaurants" alone is on about a third of all
+# businesses, so below max_df, yet it would give every pair of restaurants a
+# non-zero score and make the "sparse" products close to dense.
+GENERIC_CATEGORIES = {
+    'restaurants', 'food', 'nightlife', 'shopping', 'event planning & services',
+    'local services', 'home services',
+}
+# ---------------------
+
+
+def profile_terms(doc):
+    """
+    Turns one business profile into its TF-IDF terms.
+    Categories ("Mexican, Tacos") and the precomputed positive keywords
+    ("great salsa,friendly staff") are both comma-separated; prefixing keeps
+    a category and a keyword with the same text apart. Generic top-level
+    categories are dropped: they say nothing about which restaurants are alike.
+    """
+    categories, keywords = doc
+    cats = (c.strip().lower() for c in (categories or '').split(','))
+    terms = [f"cat:{c}" for c in cats if c and c not in GENERIC_CATEGORIES]
+    terms += [f"kw:{k.strip().lower()}" for k in (keywords or '').split(',') if k.strip()]
+    return terms
+
+
+def load_profiles(conn):
+    """Loads one profile row per business; keywords are optional if precompute_nlp.py hasn't run."""
+    has_nlp = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='business_nlp'"
+    ).fetchone() is not None
+    keywords_col = "n.positive_keywords" if has_nlp else "NULL"
+    join = "LEFT JOIN business_nlp n ON b.business_id = n.business_id" if has_nlp else ""
+    query = f"""
+    SELECT b.business_id, b.name, b.city, b.state, b.stars, b.categories,
+           {keywords_col} AS keywords
+    FROM business b
+    {join}
+    """
+    return pd.read_sql(query, conn)
+
+
+def build_vectors(business_df):
+    """Returns an L2-normalized sparse (n_businesses x n_terms) TF-IDF matrix."""
+    docs = list(zip(business_df['categories'], business_df['keywords']))
+    vectorizer = TfidfVectorizer(
+        analyzer=profile_terms,
+        min_df=2,        # a term only one business has can't make two businesses similar
+        max_df=0.5,      # backstop for any other term on half the businesses (see GENERIC_CATEGORIES)
+        dtype=np.float32,
+    )
+    return vectorizer.fit_transform(docs).tocsr()
+
+
+def top_k_block(query, candidates_t, query_rows, candidate_rows, k):
+    """
+    Cosine top-K for one block of query rows against a candidate set.
+
+    query is a (b x t) CSR slice and candidates_t the transposed (t x c)
+    candidate matrix, so the product stays sparse: only pairs sharing at
+    least one term are ever materialized. Returns flat arrays of
+    (query row, neighbor row, rank, score) in global row numbers.
+    """
+    sims = (query @ candidates_t).tocsr()
+    out_q, out_n, out_rank, out_score = [], [], [], []
+    for i in range(sims.shape[0]):
+        lo, hi = sims.indptr[i], sims.indptr[i + 1]
+        cols = candidate_rows[sims.indices[lo:hi]]
+        vals = sims.data[lo:hi]
+
+        not_self = cols != query_rows[i]
+        cols, vals = cols[not_self], vals[not_self]
+        if len(vals) > k:
+            part = np.argpartition(-vals, k)[:k]
+            cols, vals = cols[part], vals[part]
+        order = np.argsort(-vals, kind='stable')
+
+        out_q.append(np.full(len(order), query_rows[i]))
+        out_n.append(cols[order])
+        out_rank.append(np.arange(1, len(order) + 1))
+        out_score.append(vals[order])
+
+    if not out_q:
+        empty = np.array([], dtype=np.int64)
+        return empty, empty, empty, np.array([], dtype=np.float32)
+    return (np.concatenate(out_q), np.concatenate(out_n),
+            np.concatenate(out_rank), np.concatenate(out_score))
+
+
+def make_tasks(matrix, business_df, same_city, pair_budget):
+    """
+    Splits the work into (query block, candidate set) tasks.
+    With same_city, each (city, state) group is only compared against itself,
+    which is both what users expect and far cheaper than all-pairs.
+    Blocks are sized so rows x candidates stays within pair_budget, so a block
+    against all ~150k businesses is small and one within a town is large.
+    """
+    if same_city:
+        groups = business_df.groupby(['city', 'state'], dropna=False, sort=False).indices.values()
+    else:
+        groups = [np.arange(matrix.shape[0])]
+
+    for rows in groups:
+        rows = np.asarray(rows)
+        if len(rows) < 2:
+            continue
+        candidates_t = matrix[rows].T.tocsc()
+        block_size = max(1, pair_budget // len(rows))
+        for start in range(0, len(rows), block_size):
+            block = rows[start:start + block_size]
+            yield matrix[block], candidates_t, block, rows
+
+
+def write_neighbors(conn, business_df, q, n, rank, score):
+    """
+    Replaces the neighbors table. It's keyed (business_id, rank) WITHOUT ROWID,
+    so the API reads a business's whole list with one clustered range scan, and
+    the neighbor's display fields are stored inline so no join is needed.
+    Rows go into a staging table that is swapped in with one transaction, so
+    the API keeps serving the old neighbors until the new ones are complete.
+    """
+    neighbors_df = pd.DataFrame({
+        'business_id': business_df['business_id'].to_numpy()[q],
+        'rank': rank.astype(int),
+        'neighbor_id': business_df['business_id'].to_numpy()[n],
+        'neighbor_name': business_df['name'].to_numpy()[n],
+        'neighbor_city': business_df['city'].to_numpy()[n],
+        'neighbor_stars': business_df['stars'].to_numpy()[n],
+        'score': np.round(score.astype(float), 4),
+    })
+
+    staging = f"{TABLE_NAME}_new"
+    cursor = conn.cursor()
+    cursor.execute(f"DROP TABLE IF EXISTS {staging}")
+    cursor.execute(f"""
+    CREATE TABLE {staging} (
+        business_id TEXT NOT NULL,
+        rank INTEGER NOT NULL,
+        neighbor_id TEXT NOT NULL,
+        neighbor_name TEXT,
+        neighbor_city TEXT,
+        neighbor_stars REAL,
+        score REAL,
+        PRIMARY KEY (business_id, rank)
+    ) WITHOUT ROWID;
+    """)
+    conn.commit()
+    neighbors_df.to_sql(staging, conn, if_exists='append', index=False)
+
+    cursor.execute("BEGIN")
+    try:
+        cursor.execute(f"DROP TABLE IF EXISTS {TABLE_NAME}")
+        cursor.execute(f"ALTER TABLE {staging} RENAME TO {TABLE_NAME}")
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    return len(neighbors_df)
+
+
+def precompute_similar(db_path=DATABASE_FILE, k=TOP_K, same_city=True, n_jobs=N_JOBS,
+                       pair_budget=PAIR_BUDGET, profiler=None):
+    """Builds business profile vectors and stores each business's top-K most similar businesses."""
+    profiler = profiler or profiling.disabled()
+    conn = profiler.attach(sqlite3.connect(db_path))
+    try:
+        start = time.time()
+        with profiler.phase('load'):
+            business_df = load_profiles(conn)
+        print(f"Loaded {len(business_df):,} business profiles in {time.time() - start:.2f}s")
+        if business_df.empty:
+            print("No businesses found. Exiting.")
+            return
+
+        with profiler.phase('transform'):
+            try:
+                matrix = build_vectors(business_df)
+            except ValueError as e:
+                # Too few businesses for the min_df/max_df window, or every term pruned.
+                print(f"Nothing to compare ({e}).")
+                return
+        print(f"Profile matrix: {matrix.shape[0]:,} x {matrix.shape[1]:,}, {matrix.nnz:,} non-zeros")
+
+        scope = "within each city" if same_city else "across all businesses"
+        print(f"Computing top-{k} neighbors {scope} (n_jobs={n_jobs})...")
+        t0 = time.time()
+        with profiler.phase('fit'):
+            results = Parallel(n_jobs=n_jobs)(
+                delayed(top_k_block)(query, candidates_t, block, rows, k)
+                for query, candidates_t, block, rows in make_tasks(matrix, business_df, same_city, pair_budget)
+            )
+        print(f"Similarity search finished in {time.time() - t0:.2f}s")
+
+        if not results:
+            print("Nothing to compare (every group has a single business).")
+            return
+        q, n, rank, score = (np.concatenate(parts) for parts in zip(*results))
+
+        with profiler.phase('write'):
+            written = write_neighbors(conn, business_df, q, n, rank, score)
+        print(f"Wrote {written:,} rows to '{TABLE_NAME}'.")
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute top-K similar businesses into 'business_neighbors'.")
+    parser.add_argument("--db", default=DATABASE_FILE, help="Path to sqlite3 database (default: yelp.db)")
+    parser.add_argument("--k", type=int, default=TOP_K, help="Neighbors per business (default: 10)")
+    parser.add_argument("--all-cities", action="store_true", help="Don't restrict neighbors to the same city")
+    parser.add_argument("--jobs", type=int, default=N_JOBS, help=f"Parallel workers (default: {N_JOBS})")
+    parser.add_argument("--pair-budget", type=int, default=PAIR_BUDGET,
+                        help="Max query x candidate pairs per sparse product; bounds memory per worker")
+    profiling.add_profile_argument(parser)
+    args = parser.parse_args()
+
+    start_all = time.time()
+    with profiling.JobProfiler.from_args("precompute_similar", args) as profiler:
+        precompute_similar(db_path=args.db, k=args.k, same_city=not args.all_cities,
+                           n_jobs=args.jobs, pair_budget=args.pair_budget, profiler=profiler)
+    print(f"Total elapsed: {time.time() - start_all:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
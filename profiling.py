@@ -0,0 +1,248 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+# --- Configuration ---
+PROFILE_DIR = 'profiles'
+TOP_FUNCTIONS = 40
+TOP_ALLOCATORS = 25
+TOP_STATEMENTS = 50
+SQL_KEY_CHARS = 200
+# ---------------------
+
+
+def add_profile_argument(parser):
+    """
+    Adds the shared --profile option to an offline job's argument parser.
+
+    `--profile` on its own writes the report to profiles/<job>-<timestamp>.json;
+    `--profile some/path.json` writes it to an explicit location instead.
+    """
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="REPORT",
+        help="Capture cProfile, tracemalloc, phase and SQL timings into a JSON report",
+    )
+    return parser
+
+
+def _statement_key(sql):
+    """
+    Cheap per-statement grouping key for the trace callback. On Python 3.11+
+    SQLite hands us the SQL with bound values expanded, so we never scan the
+    whole string: INSERTs are cut before VALUES, anything else is truncated.
+    """
+    cut = sql.find(' VALUES')
+    return sql[:cut] if cut != -1 else sql[:SQL_KEY_CHARS]
+
+
+def _normalize_sql(sql):
+    """Collapses whitespace and literals so repeated statements aggregate together."""
+    sql = re.sub(r"'(?:[^']|'')*'", "?", sql)
+    sql = re.sub(r"\b\d+(\.\d+)?\b", "?", sql)
+    return " ".join(sql.split())
+
+
+class JobProfiler:
+    """
+    Collects a structured performance report for one run of an offline job.
+
+    Use it as a context manager around the whole job, wrap the interesting
+    stages in `profiler.phase("load")` etc., and call `profiler.attach(conn)`
+    on every SQLite connection the job opens. When disabled every hook is a
+    no-op, so the jobs can call them unconditionally.
+    """
+
+    def __init__(self, job_name, report_path=None, enabled=True):
+        self.job_name = job_name
+        self.enabled = enabled
+        if report_path:
+            self.report_path = report_path
+        else:
+            stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+            self.report_path = os.path.join(PROFILE_DIR, f"{job_name}-{stamp}.json")
+
+        self.phases = {}
+        self.sql_stats = {}
+        self._pending_sql = None
+        self._profile = None
+        self._started_at = None
+        self._start = None
+
+    @classmethod
+    def from_args(cls, job_name, args):
+        """Builds a profiler from parsed CLI args (see add_profile_argument)."""
+        profile = getattr(args, 'profile', None)
+        return cls(job_name, report_path=profile or None, enabled=profile is not None)
+
+    # --- Lifecycle ---
+    def __enter__(self):
+        if not self.enabled:
+            return self
+        self._started_at = datetime.now(timezone.utc).isoformat()
+        tracemalloc.start(10)
+        self._profile = cProfile.Profile()
+        self._start = time.perf_counter()
+        self._profile.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if not self.enabled:
+            return False
+        self._profile.disable()
+        wall = time.perf_counter() - self._start
+        self._flush_sql()
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        report = {
+            "job": self.job_name,
+            "argv": sys.argv,
+            "python": sys.version.split()[0],
+            "started_at": self._started_at,
+            "status": "error" if exc_type else "ok",
+            "wall_seconds": round(wall, 4),
+            "phases": {name: round(sec, 4) for name, sec in self.phases.items()},
+            "memory": {
+                "peak_bytes": peak,
+                "top_allocators": self._top_allocators(snapshot),
+            },
+            "functions": self._top_functions(),
+            "sql": self._top_statements(),
+        }
+
+        os.makedirs(os.path.dirname(self.report_path) or '.', exist_ok=True)
+        with open(self.report_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        # Keep the raw profile too, so it can be opened in snakeviz / pstats.
+        self._profile.dump_stats(os.path.splitext(self.report_path)[0] + '.prof')
+        print(f"Profile report written to '{self.report_path}'")
+        return False
+
+    # --- Hooks used by the jobs ---
+    @contextmanager
+    def phase(self, name):
+        """Times a named stage (load, transform, fit, write...). Repeated phases accumulate."""
+        if not self.enabled:
+            yield
+            return
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._flush_sql()
+            self.phases[name] = self.phases.get(name, 0.0) + (time.perf_counter() - t0)
+
+    def iter_phase(self, iterable, name):
+        """Yields from a lazy iterable (e.g. a chunked reader), charging each fetch to a phase."""
+        if not self.enabled:
+            yield from iterable
+            return
+        iterator = iter(iterable)
+        while True:
+            with self.phase(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def attach(self, conn):
+        """
+        Registers a statement trace callback on a sqlite3 connection.
+
+        SQLite only tells us when a statement starts, so each statement is
+        charged the time until the next statement starts (or the enclosing
+        phase ends). That includes the Python time spent consuming its rows,
+        which is what we want to see for pandas.read_sql-heavy jobs.
+        """
+        if self.enabled:
+            conn.set_trace_callback(self._on_statement)
+        return conn
+
+    # --- Internals ---
+    def _on_statement(self, sql):
+        now = time.perf_counter()
+        self._flush_sql(now)
+        self._pending_sql = (_statement_key(sql), now)
+
+    def _flush_sql(self, now=None):
+        if self._pending_sql is None:
+            return
+        sql, started = self._pending_sql
+        elapsed = (now or time.perf_counter()) - started
+        stats = self.sql_stats.get(sql)
+        if stats is None:
+            stats = self.sql_stats[sql] = [0, 0.0, 0.0]
+        stats[0] += 1
+        stats[1] += elapsed
+        if elapsed > stats[2]:
+            stats[2] = elapsed
+        self._pending_sql = None
+
+    def _top_statements(self):
+        # Normalize once per distinct key, merging keys that differ only in literals.
+        merged = {}
+        for key, (count, total, longest) in self.sql_stats.items():
+            s = merged.setdefault(_normalize_sql(key), {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+            s["count"] += count
+            s["total_seconds"] += total
+            s["max_seconds"] = max(s["max_seconds"], longest)
+        ranked = sorted(merged.items(), key=lambda kv: kv[1]["total_seconds"], reverse=True)
+        return [
+            {
+                "sql": sql,
+                "count": s["count"],
+                "total_seconds": round(s["total_seconds"], 4),
+                "max_seconds": round(s["max_seconds"], 4),
+            }
+            for sql, s in ranked[:TOP_STATEMENTS]
+        ]
+
+    def _top_allocators(self, snapshot):
+        snapshot = snapshot.filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ])
+        return [
+            {
+                "location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                "size_bytes": stat.size,
+                "count": stat.count,
+            }
+            for stat in snapshot.statistics('lineno')[:TOP_ALLOCATORS]
+        ]
+
+    def _top_functions(self):
+        stats = pstats.Stats(self._profile, stream=io.StringIO())
+        own_file = os.path.abspath(__file__)
+        rows = []
+        for (filename, lineno, func), (_, ncalls, tottime, cumtime, _) in stats.stats.items():
+            # Leave the profiler's own hooks out of the report, as _top_allocators does.
+            if os.path.abspath(filename) == own_file:
+                continue
+            rows.append({
+                "function": f"{filename}:{lineno}({func})",
+                "ncalls": ncalls,
+                "tottime": round(tottime, 4),
+                "cumtime": round(cumtime, 4),
+            })
+        rows.sort(key=lambda r: r["cumtime"], reverse=True)
+        return rows[:TOP_FUNCTIONS]
+
+
+def disabled(job_name='job'):
+    """A profiler whose hooks do nothing; the default for jobs run without --profile."""
+    return JobProfiler(job_name, enabled=False)
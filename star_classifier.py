@@ -1,3 +1,4 @@
+import argparse
 import pandas as pd
 import sqlite3
 import time
@@ -8,19 +9,22 @@ from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import classification_report
 
+import profiling
+
 # --- Configuration ---
 DATABASE_FILE = 'yelp.db'
 MODEL_FILE = 'star_classifier.joblib'
 # ---------------------
 
-def train_model():
+def train_model(profiler=None):
     """
     This is an OFFLINE script.
     It loads a subset of the data, trains a machine learning pipeline,
     evaluates it, and saves the final model to a file for the API to use.
     """
+    profiler = profiler or profiling.disabled()
     print(f"Connecting to {DATABASE_FILE}...")
-    conn = sqlite3.connect(DATABASE_FILE)
+    conn = profiler.attach(sqlite3.connect(DATABASE_FILE))
 
     # 1. Load Data
     # We only use 1-star and 5-star reviews to create a clear
@@ -28,12 +32,14 @@ def train_model():
     print("Loading 1-star and 5-star reviews (this will take a minute)...")
     start_time = time.time()
     query = "SELECT text, stars FROM review WHERE stars = 1 OR stars = 5"
-    df = pd.read_sql(query, conn)
+    with profiler.phase('load'):
+        df = pd.read_sql(query, conn)
     conn.close()
     
     # Simple data cleaning: ensure text is a string and stars are integers.
-    df['text'] = df['text'].fillna('').astype(str)
-    df['stars'] = df['stars'].astype(int)
+    with profiler.phase('transform'):
+        df['text'] = df['text'].fillna('').astype(str)
+        df['stars'] = df['stars'].astype(int)
 
     print(f"Loaded {len(df):,} rows in {time.time() - start_time:.2f}s")
     
@@ -71,13 +77,15 @@ def train_model():
     # 4. Train the model
     print("Training model... this is the heavy part and will take several minutes.")
     start_time = time.time()
-    pipeline.fit(X_train, y_train)
+    with profiler.phase('fit'):
+        pipeline.fit(X_train, y_train)
     print(f"Training complete in {time.time() - start_time:.2f}s")
 
     # 5. Evaluate the model
     # How well did it do on the unseen test data?
     print("\n--- Model Evaluation on Test Set ---")
-    y_pred = pipeline.predict(X_test)
+    with profiler.phase('evaluate'):
+        y_pred = pipeline.predict(X_test)
     report = classification_report(y_test, y_pred)
     print(report)
     print("------------------------------------")
@@ -85,9 +93,15 @@ def train_model():
     # 6. Save the trained pipeline to disk
     # joblib is the standard way to save sklearn models.
     print(f"Saving trained model pipeline to '{MODEL_FILE}'...")
-    joblib.dump(pipeline, MODEL_FILE, compress=3) # Add compression to reduce file size
+    with profiler.phase('write'):
+        joblib.dump(pipeline, MODEL_FILE, compress=3) # Add compression to reduce file size
     print(f"--- Model saved successfully! ---")
 
 
 if __name__ == "__main__":
-    train_model()
+    parser = argparse.ArgumentParser(description="Train the 1-star vs 5-star review classifier.")
+    profiling.add_profile_argument(parser)
+    args = parser.parse_args()
+
+    with profiling.JobProfiler.from_args('star_classifier', args) as profiler:
+        train_model(profiler=profiler)